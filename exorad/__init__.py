@@ -28,4 +28,5 @@ from exorad.cache import GlobalCache
 
 gc = GlobalCache()
 gc['n_thread'] = 1
+gc['n_channel_thread'] = 1
 gc['debug'] = False
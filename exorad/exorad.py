@@ -34,13 +34,15 @@ def efficiency_plot(channels, output_dir=None):
     plt.close()
 
 
-def standard_pipeline(options, target_list, output=None, plot=False, full_contrib=False, n_thread=1, debug=False):
+def standard_pipeline(options, target_list, output=None, plot=False, full_contrib=False, n_thread=1, debug=False,
+                      n_channel_thread=1):
     from exorad.utils.ascii_art import ascii_art
     logger.info(ascii_art)
     logger.info('code version {}'.format(version))
 
     gc = GlobalCache()
     gc['n_thread'] = n_thread
+    gc['n_channel_thread'] = n_channel_thread
     gc['debug'] = debug
 
     if debug: setLogLevel(logging.DEBUG)
@@ -102,6 +104,8 @@ def main():
                         required=False, help="produce full contribution output", action='store_true')
     parser.add_argument("-n", "--nThreads", dest='numberOfThreads', default=1, type=int,
                         required=False, help="number of threads for parallel processing")
+    parser.add_argument("--nChannelThreads", dest='numberOfChannelThreads', default=1, type=int,
+                        required=False, help="number of processes to build the payload channels")
     parser.add_argument("-d", "--debug", dest='debug', default=False,
                         required=False, help="log output on screen", action='store_true')
     parser.add_argument("-P", "--plot", dest='plot', default=False,
@@ -111,4 +115,5 @@ def main():
 
     standard_pipeline(options=args.opt, target_list=args.targetList,
                       output=args.output, plot=args.plot, full_contrib=args.contrib,
-                      debug=args.debug, n_thread=args.numberOfThreads)
+                      debug=args.debug, n_thread=args.numberOfThreads,
+                      n_channel_thread=args.numberOfChannelThreads)
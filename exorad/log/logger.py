@@ -33,15 +33,26 @@ root_logger.setLevel(logging.INFO)
 
 class Logger:
     """
-    Standard logging using logger library
+    Standard logging using logger library.
+    The logger only depends on the class name, so it is resolved once per class and shared by all its instances.
     """
 
+    __slots__ = ()
+
+    _log_name = 'exorad.Logger'
+    _logger = logging.getLogger(_log_name)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._log_name = 'exorad.{}'.format(cls.__name__)
+        cls._logger = logging.getLogger(cls._log_name)
+
     def __init__(self):
         self.set_log_name()
 
     def set_log_name(self):
-        self._log_name = 'exorad.{}'.format(self.__class__.__name__)
-        self._logger = logging.getLogger('exorad.{}'.format(self.__class__.__name__))
+        """ Kept for compatibility: the class logger is already set when the class is created """
+        pass
 
     def info(self, message, *args, **kwargs):
         """ See :class:`logging.Logger` """
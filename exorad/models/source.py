@@ -168,7 +168,7 @@ class CustomSed(Logger, object):
 
     def __init__(self, fname, star_radius, star_distance):
         self.set_log_name()
-        ph = ascii.read(fname, format='ecsv')
+        ph = ascii.read(fname, format='ecsv', guess=False)
         ph_wl = ph['Wavelength'].data * ph['Wavelength'].unit
         ph_sed = ph['Sed'].data * ph['Sed'].unit
 
@@ -1,22 +1,111 @@
-import re
+import numbers
+from bisect import bisect_left
+from functools import lru_cache
+from types import SimpleNamespace
 
 import numpy as np
-import xlrd
+import pandas as pd
 from astropy import constants as cc
 from astropy import units as u
-from astropy.io import ascii
+from astropy.table import QTable
 
 from exorad.log.logger import Logger
 from exorad.models.source import Star, CustomSed
 
-compactString = lambda string: string.replace(' ', '').replace('-', '').lower()
 stripUnitString = lambda string: string.replace('[', '').replace(']', '')
 
 
+@lru_cache(maxsize=8192)
+def compactString(string):
+    # repeated searches usually compact the same names and queries
+    return string.replace(' ', '').replace('-', '').lower()
+
+
+@lru_cache(maxsize=None)
+def _parse_unit(str_unit):
+    # astropy units are immutable, so each distinct unit string is parsed only once
+    return u.Unit(stripUnitString(str_unit))
+
+
+def read_xlsx_rows(filename, sheet_name='Sheet1'):
+    '''
+    Returns the content of an excel sheet as a list of rows.
+    Leading empty rows and columns are kept, so that cells can be addressed by their absolute position.
+    '''
+    # imported here: python-calamine is only needed by the excel target lists
+    from python_calamine import CalamineWorkbook
+    sheet = CalamineWorkbook.from_path(filename).get_sheet_by_name(sheet_name)
+    return sheet.to_python(skip_empty_area=False)
+
+
+def calc_logg(M, R):
+    '''
+    Returns the logarithm of the surface gravity in cgs units.
+    M and R can be scalar or array Quantities, so that a whole target list can be computed at once.
+    '''
+    # the units are removed first: Quantity arithmetic is much slower than the plain numpy one
+    m = M.to_value(u.kg)
+    r = R.to_value(u.m)
+    return np.log10(cc.G.value * m / r ** 2 * 100.0)
+
+
+def search_key(star_name, planet_name=''):
+    '''
+    Returns the compacted star and planet names of a target, used by the target list search
+    '''
+    return compactString(str(star_name)) + '\x00' + compactString(str(planet_name))
+
+
+class _NameIndex(object):
+    '''
+    Suffix index of the compacted target names.
+    A substring query is answered with a binary search over the sorted name suffixes, instead of a scan of all the names.
+    '''
+
+    def __init__(self, search_keys):
+        suffixes = []
+        for i, key in enumerate(search_keys):
+            for name in key.split('\x00'):
+                suffixes.extend((name[j:], i) for j in range(len(name)))
+        suffixes.sort()
+        self._suffixes = [suffix for suffix, i in suffixes]
+        self._ids = [i for suffix, i in suffixes]
+        self._n_targets = len(search_keys)
+
+    def search(self, searchName):
+        if not searchName:
+            return list(range(self._n_targets))
+        ids = set()
+        for j in range(bisect_left(self._suffixes, searchName), len(self._suffixes)):
+            if not self._suffixes[j].startswith(searchName):
+                break
+            ids.add(self._ids[j])
+        return sorted(ids)
+
+
+def _table_column(values):
+    # Quantities, strings and numbers are stored as typed arrays, anything else (e.g. masked values) as objects
+    if all(isinstance(v, u.Quantity) for v in values):
+        return u.Quantity(values)
+    if all(isinstance(v, str) for v in values) or all(isinstance(v, numbers.Number) for v in values):
+        return np.asarray(values)
+    column = np.empty(len(values), dtype=object)
+    for i, v in enumerate(values):
+        column[i] = v
+    return column
+
+
+def _table_cell(column, i):
+    value = column[i]
+    return str(value) if isinstance(value, np.str_) else value
+
+
 class Target(Logger, object):
     '''
-    Target base class
+    Target base class.
+    Attributes are stored in slots, to reduce the memory used by large target lists.
     '''
+    __slots__ = ('name', 'id', 'star', 'planet', 'table', 'foreground', 'skyTransmission')
 
     def __init__(self):
         self.set_log_name()
@@ -30,12 +119,7 @@ class Target(Logger, object):
         name = None
 
     def calc_logg(self, M, R):
-        m = M.si
-        r = R.si
-        g = cc.G * m / r ** 2
-        g = g.to(u.cm / u.s ** 2)
-
-        return np.log10(g.value)
+        return calc_logg(M, R)
 
     def update_target(self, obj):
         if isinstance(obj, Star) or isinstance(obj, CustomSed):
@@ -61,12 +145,19 @@ class Target(Logger, object):
 
 
 class BaseTargetList(Logger, object):
+    '''
+    Target list base class.
+    The target data are stored column by column in a table, with star and planet columns prefixed by `star_` and `planet_`.
+    Targets are built from the table rows only when they are first accessed.
+    '''
 
     def __init__(self):
         self.set_log_name()
 
         self.read_data()
-        self._targets = self.create_target_list()
+        self._table = self.create_target_table()
+        self._targets = [None] * len(self._table)
+        self._name_index = None
 
     def star_keys(self):
         raise NotImplementedError
@@ -77,15 +168,12 @@ class BaseTargetList(Logger, object):
     def read_data(self):
         raise NotImplementedError
 
-    def create_target_list(self):
+    def create_target_table(self):
 
         star_keys = self.star_keys()
 
         star_data = self.star_data()
 
-        # print(planet_data)
-        # print(type(planet_data))
-        # quit()
         planet_data = None
         planet_keys = None
         try:
@@ -93,53 +181,62 @@ class BaseTargetList(Logger, object):
             planet_data = self.planet_data()
         except: pass
 
-        target_list = []
+        table = QTable()
+        for k, col in zip(star_keys, zip(*star_data)):
+            table['star_{}'.format(k)] = _table_column(col)
         if planet_data:
-            for i,(star, planet) in enumerate(zip(star_data, planet_data)):
-                target = Target()
-                target.planet = Target()
-                target.star = Target()
-
-                planet_dict = dict(zip(planet_keys, planet))
-
-                target.planet.__dict__.update(planet_dict)
-
-                star_dict = dict(zip(star_keys, star))
-
-                target.star.__dict__.update(star_dict)
-                target.name = target.planet.name
-                target.id = i
-
-                target_list.append(target)
+            for k, col in zip(planet_keys, zip(*planet_data)):
+                table['planet_{}'.format(k)] = _table_column(col)
+            names = zip(table['star_name'], table['planet_name'])
         else:
-            for i, star in enumerate(star_data):
-                target = Target()
-                target.star = Target()
-                target.id = i
-
-                star_dict = dict(zip(star_keys, star))
-
-                target.star.__dict__.update(star_dict)
-                target.name = target.star.name
+            names = zip(table['star_name']) if len(table.colnames) else []
+        table['name_compact'] = np.array([search_key(*n) for n in names], dtype=str)
+        return table
+
+    def _keys(self, prefix):
+        return [k[len(prefix):] for k in self._table.colnames if k.startswith(prefix)]
+
+    def _make_target(self, i):
+        # star and planet are plain attribute containers: only the outer Target needs the Logger set up
+        target = Target()
+        target.star = SimpleNamespace(**{k: _table_cell(self._table['star_' + k], i)
+                                         for k in self._keys('star_')})
+        planet_keys = self._keys('planet_')
+        if planet_keys:
+            target.planet = SimpleNamespace(**{k: _table_cell(self._table['planet_' + k], i)
+                                               for k in planet_keys})
+            target.name = target.planet.name
+        else:
+            target.name = target.star.name
+        target.id = i
+        return target
+
+    def __len__(self):
+        return len(self._targets)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(len(self))[i]]
+        # negative indices are converted, so that each target is cached in its own slot with its own id
+        i = range(len(self))[i]
+        if self._targets[i] is None:
+            self._targets[i] = self._make_target(i)
+        return self._targets[i]
 
-                target_list.append(target)
-        return target_list
+    @property
+    def table(self):
+        return self._table
 
     @property
     def target(self):
-        return self._targets
+        return [self[i] for i in range(len(self))]
 
     def searchTarget(self, name):
         # method inspired from similar functionality in ExoData
         searchName = compactString(name)
-        returnList = []
-
-        for target in self.target:
-            if re.search(searchName, compactString(str(target.star.name))) or re.search(searchName, compactString(
-                    str(target.planet.name))):
-                returnList.append(target)
-
-        return returnList
+        if self._name_index is None:
+            self._name_index = _NameIndex(list(self._table['name_compact']))
+        return [self[i] for i in self._name_index.search(searchName)]
 
 
 class XLXSTargetList(BaseTargetList):
@@ -155,23 +252,27 @@ class XLXSTargetList(BaseTargetList):
         super().__init__()
 
     def __parseData__(self, col_range):
-        Sheet = self.tmpSheet
-        keys = Sheet.row_values(2)[col_range[0]:col_range[1] + 1]
+        rows = self.tmpRows
+        keys = rows[2][col_range[0]:col_range[1] + 1]
         keys[0] = 'name'
         obj = {}
 
-        for key, col in zip(keys, list(range(col_range[0], col_range[1] + 1))):
-            str_unit = Sheet.cell_value(rowx=self.units_row, colx=col)
+        units = rows[self.units_row][col_range[0]:col_range[1] + 1]
+        # the data rows are sliced once and transposed into columns in a single pass
+        data = [r[col_range[0]:col_range[1] + 1] for r in rows[self.data_row0:]]
+        columns = list(zip(*data)) if data else [()] * len(keys)
+
+        for key, str_unit, column in zip(keys, units, columns):
             if len(str_unit) > 0:
                 try:
-                    dim = u.Unit(stripUnitString(str_unit))
+                    dim = _parse_unit(str_unit)
                 except ValueError:
                     self.warning('Unrecognised physical units')
                     dim = 1
             else:
                 dim = 1
 
-            obj[key] = Sheet.col_values(col)[self.data_row0:] * dim
+            obj[key] = list(column) * dim
 
         return obj
 
@@ -182,20 +283,16 @@ class XLXSTargetList(BaseTargetList):
         return self.star.keys()
 
     def planet_data(self):
-        planet_list = list(self.planet.values())
-        return list(map(list, zip(*planet_list)))
+        return list(zip(*self.planet.values()))
 
     def star_data(self):
-        star_list = list(self.star.values())
-        return list(map(list, zip(*star_list)))
+        return list(zip(*self.star.values()))
 
     def read_data(self):
-
-        xl_workbook = xlrd.open_workbook(self.filename)
-        self.tmpSheet = xl_workbook.sheet_by_name('Sheet1')
+        self.tmpRows = read_xlsx_rows(self.filename)
 
         self.planet = self.__parseData__(col_range=self.planet_data_columns)
-        self.planet['Nobs'] = self.tmpSheet.col_values(self.number_to_be_observed_column)[self.data_row0:]
+        self.planet['Nobs'] = [r[self.number_to_be_observed_column] for r in self.tmpRows[self.data_row0:]]
 
         self.star = self.__parseData__(col_range=self.star_data_columns)
 
@@ -206,53 +303,50 @@ class CSVTargetList(BaseTargetList):
         super().__init__()
 
     def read_data(self):
-        self.tmpTab = ascii.read(self.filename, format="csv")
+        # as in astropy.io.ascii, spaces after the separators are skipped and only empty cells are missing
+        self.tmpTab = pd.read_csv(self.filename, skipinitialspace=True,
+                                  keep_default_na=False, na_values=['']).rename(columns=str.strip)
+        # column keys and units are parsed once per file: (column name, key, unit or None)
+        self._star_cols = self.__parseHeader__("star")
+        self._planet_cols = self.__parseHeader__("planet")
+
+    def __parseHeader__(self, obj):
+        cols = []
+        for k in self.tmpTab.columns:
+            if obj not in k:
+                continue
+            split = k.split(' ')
+            un = _parse_unit(split[2]) if len(split) == 3 else None
+            cols.append((k, split[1], un))
+        return cols
 
     def star_keys(self):
-        s_col = [k for k in self.tmpTab.keys() if "star" in k]
-        return [k.split(' ')[1] for k in s_col]
+        return [key for k, key, un in self._star_cols]
 
     def star_data(self):
-        star_k = [k for k in self.tmpTab.keys() if "star" in k]
-        units = []
-        for n, k in enumerate(star_k):
-            if len(k.split(' ')) == 3:
-                un = k.split(' ')[2]
-                units.append(1 * u.Unit(stripUnitString(un)))
-            else:
-                units.append(None)
-        dat = []
-        for i in range(len(self.tmpTab[star_k])):
-            val = list(self.tmpTab[star_k][i])
-
-            for n in range(len(val)):
-                if units[n] is not None:
-                    val[n] = val[n] * units[n]
-            dat.append([str(x) if isinstance(x, np.str_) else x for x in val])
-        return dat
+        return self.__parseColumns__(self._star_cols)
 
     def planet_keys(self):
-        s_col = [k for k in self.tmpTab.keys() if "planet" in k]
-        return [k.split(' ')[1] for k in s_col]
+        return [key for k, key, un in self._planet_cols]
 
     def planet_data(self):
-        planet_k = [k for k in self.tmpTab.keys() if "planet" in k]
-        units = []
-        for n, k in enumerate(planet_k):
-            if len(k.split(' ')) == 3:
-                un = k.split(' ')[2]
-                units.append(1 * u.Unit(stripUnitString(un)))
-            else:
-                units.append(None)
-        dat = []
-        for i in range(len(self.tmpTab[planet_k])):
-            val = list(self.tmpTab[planet_k][i])
-
-            for n in range(len(val)):
-                if units[n] is not None:
-                    val[n] = val[n] * units[n]
-            dat.append([str(x) if isinstance(x, np.str_) else x for x in val])
-        return dat
+        return self.__parseColumns__(self._planet_cols)
+
+    def __parseColumns__(self, cols):
+        # units are applied to each column as a whole and the rows are assembled only at the end
+        columns = []
+        for k, key, un in cols:
+            col = self.tmpTab[k]
+            data = col.to_numpy()
+            if pd.api.types.is_object_dtype(col):
+                data = data.tolist()
+            elif un is not None:
+                data = data * un
+            missing = col.isna().to_numpy()
+            if missing.any():
+                data = [np.ma.masked if m else v for v, m in zip(data, missing)]
+            columns.append(data)
+        return list(zip(*columns))
 
 
 class OldExcelTargetList(Logger, object):
@@ -266,53 +360,48 @@ class OldExcelTargetList(Logger, object):
         self.set_log_name()
 
         if filename.endswith('.xlsx'):
-            xl_workbook = xlrd.open_workbook(filename)
-
-            tmpSheet = xl_workbook.sheet_by_name('Sheet1')
-            tmpSheet = tmpSheet
+            rows = read_xlsx_rows(filename)
 
-            star = self.__parseData__(tmpSheet, col_range=self.star_data_columns)
+            star = self.__parseData__(rows, col_range=self.star_data_columns)
 
             key0 = list(star.keys())[0]
             n_targets = len(star[key0])
 
+            key_list = list(star.keys())
             self.target = [Target() for k in range(n_targets)]
             for k, target in enumerate(self.target):
-                setattr(target, 'star', Target())
-                for key in list(star.keys()):
-                    setattr(target.star, key, star[key][k])
+                target.star = SimpleNamespace(**{key: star[key][k] for key in key_list})
+            self._name_index = None
         else:
             self.error("Wrong target list format")
             raise IOError("Wrong target list format")
 
-    def __parseData__(self, Sheet, col_range):
-        keys = Sheet.row_values(2)[col_range[0]:col_range[1] + 1]
+    def __parseData__(self, rows, col_range):
+        keys = rows[2][col_range[0]:col_range[1] + 1]
         keys[0] = 'name'
         obj = {}
 
-        for key, col in zip(keys, list(range(col_range[0], col_range[1] + 1))):
-            str_unit = Sheet.cell_value(rowx=self.units_row, colx=col)
+        units = rows[self.units_row][col_range[0]:col_range[1] + 1]
+        data = [r[col_range[0]:col_range[1] + 1] for r in rows[self.data_row0:]]
+        columns = list(zip(*data)) if data else [()] * len(keys)
+
+        for key, str_unit, column in zip(keys, units, columns):
             if len(str_unit) > 0:
                 try:
-                    dim = u.Unit(stripUnitString(str_unit))
+                    dim = _parse_unit(str_unit)
                 except ValueError:
                     self.warning('Unrecognised physical units')
                     dim = 1
             else:
                 dim = 1
 
-            obj[key] = Sheet.col_values(col)[self.data_row0:] * dim
+            obj[key] = list(column) * dim
 
         return obj
 
     def searchTarget(self, name):
         # method inspired from similar functionality in ExoData
         searchName = compactString(name)
-        returnList = []
-
-        for target in self.target:
-            if re.search(searchName, compactString(str(target.star.name))) or re.search(searchName, compactString(
-                    str(target.planet.name))):
-                returnList.append(target)
-
-        return returnList
+        if self._name_index is None:
+            self._name_index = _NameIndex([search_key(target.star.name) for target in self.target])
+        return [self.target[i] for i in self._name_index.search(searchName)]
@@ -1,5 +1,8 @@
+from concurrent.futures import ProcessPoolExecutor
+
 from astropy.io.misc.hdf5 import read_table_hdf5
 
+from exorad.cache import GlobalCache
 from exorad.models.instruments import Photometer, Spectrometer
 from exorad.output.hdf5 import load
 from .task import Task
@@ -54,23 +57,29 @@ class BuildInstrument(Task):
         self.addTaskParam('output', 'output object')
 
     def execute(self):
+        instrument_type = self.get_task_param('type')
+        name = self.get_task_param('name')
+        description = self.get_task_param('description')
+        payload = self.get_task_param('payload')
+        write = self.get_task_param('write')
+        output = self.get_task_param('output')
+
         try:
-            instrumentClass = instruments[self.get_task_param('type')]
+            instrumentClass = instruments[instrument_type]
         except KeyError:
             self.error('invalid instrument class')
             raise ValueError
-        instrument = instrumentClass(self.get_task_param('name'),
-                                     self.get_task_param('description'),
-                                     self.get_task_param('payload'))
+        instrument = instrumentClass(name, description, payload)
         instrument.build()
-        if self.get_task_param('write'):
-            instrument.write(self.get_task_param('output'))
+        if write:
+            instrument.write(output)
         self.set_output(instrument)
 
 
 class BuildChannels(Task):
     """
-    Initialize and build all the channels in the payload
+    Initialize and build all the channels in the payload.
+    If more than one channel thread is set in the GlobalCache (`n_channel_thread`), the channels are built in parallel processes.
 
     Parameters
     ----------
@@ -97,30 +106,52 @@ class BuildChannels(Task):
         self.addTaskParam('output', 'output object')
 
     def execute(self):
+        payload = self.get_task_param('payload')
+        write = self.get_task_param('write')
+        output = self.get_task_param('output')
+        channel_dict = payload['channel']
+
         self.info('building channel')
         channels = {}
-        self.debug('detectors found : {}'.format(self.get_task_param('payload')['channel'].keys()))
+        self.debug('detectors found : {}'.format(channel_dict.keys()))
 
         ch = None
-        if self.get_task_param('write'):
-            inst = self.get_task_param('output').create_group('payload')
-            inst.store_dictionary(self.get_task_param('payload'), group_name='payload description')
+        if write:
+            inst = output.create_group('payload')
+            inst.store_dictionary(payload, group_name='payload description')
             ch = inst.create_group('channels')
 
-        buildInstrument = BuildInstrument()
-        for det in self.get_task_param('payload')['channel'].keys():
-            channel_type = self.get_task_param('payload')['channel'][det]['channelClass']['value'].lower()
-            channels[det] = buildInstrument(type=channel_type, name=det,
-                                            description=self.get_task_param('payload')['channel'][det],
-                                            payload=self.get_task_param('payload'),
-                                            write=False,
-                                            output=None)
-            if self.get_task_param('write'):
-                channels[det].write(ch)
+        channel_types = {det: desc['channelClass']['value'].lower() for det, desc in channel_dict.items()}
+        if any(channel_type not in instruments for channel_type in channel_types.values()):
+            self.error('invalid instrument class')
+            raise ValueError
+        n_workers = min(GlobalCache()['n_channel_thread'] or 1, len(channel_dict))
+        if n_workers > 1:
+            self.debug('building channels in {} processes'.format(n_workers))
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = {det: executor.submit(_build_channel, channel_types[det], det, desc, payload)
+                           for det, desc in channel_dict.items()}
+                channels = {det: future.result() for det, future in futures.items()}
+        else:
+            for det, desc in channel_dict.items():
+                channels[det] = _build_channel(channel_types[det], det, desc, payload)
+
+        # the output file is written from this process only
+        if write:
+            for channel in channels.values():
+                channel.write(ch)
         self.debug('channels : {}'.format(channels))
         self.set_output(channels)
 
 
+def _build_channel(channel_type, name, description, payload):
+    # module level function, so that it can be sent to the worker processes.
+    # It does what BuildInstrument does, without the Task parameters handling.
+    instrument = instruments[channel_type](name, description, payload)
+    instrument.build()
+    return instrument
+
+
 class LoadPayload(Task):
     """
     Loads payload and channels from dict
@@ -176,7 +207,7 @@ class PreparePayload(Task):
     Parameters
     ----------
     payload_file: str
-        xml file with payload description
+        xml file with payload description, or h5 file with a payload already built
     output: str
         h5 output file
 
@@ -198,11 +229,12 @@ class PreparePayload(Task):
     """
 
     def __init__(self):
-        self.addTaskParam('payload_file', 'payload xml file')
+        self.addTaskParam('payload_file', 'payload xml or h5 file')
         self.addTaskParam('output', 'output file')
 
     def execute(self):
         import os
+        import h5py
         from exorad.tasks import LoadOptions
         from exorad.output.hdf5 import HDF5Output
 
@@ -213,7 +245,7 @@ class PreparePayload(Task):
         payload_file = self.get_task_param('payload_file')
         output = self.get_task_param('output')
 
-        ext = os.path.splitext(payload_file)[1]
+        ext = os.path.splitext(payload_file)[1].lower()
         if ext == '.xml':
             payload = loadOptions(filename=payload_file)
             if output is not None:
@@ -222,8 +254,9 @@ class PreparePayload(Task):
             else:
                 channels = buildChannels(payload=payload, write=False, output=None)
 
-        elif ext == 'h5':
-            payload, channels = loadPayload(input=payload_file)
+        elif ext == '.h5':
+            with h5py.File(payload_file, 'r') as file:
+                payload, channels = loadPayload(input=file)
         else:
             self.error('Unsupported payload format')
             raise IOError('Unsupported payload format')
@@ -250,9 +283,7 @@ class MergeChannelsOutput(Task):
     def execute(self):
         from exorad.utils.util import vstack_tables
         channels = self.get_task_param('channels')
-        table_list = []
-        for channel in channels.keys():
-            table_list.append(channels[channel].table)
+        table_list = [ch.table for ch in channels.values()]
         table = vstack_tables(table_list)
         self.set_output(table)
 
@@ -136,12 +136,13 @@ class LoadOptions(Task):
 
     def __read_datatable__(self, datafile, datatype):
         if datatype == 'ecsv':
+            # the format is known, so astropy format guessing is skipped
             try:
                 data = Table.read(os.path.expanduser(datafile),
-                                  format='ascii.ecsv')
+                                  format='ascii.ecsv', guess=False)
             except InconsistentTableError:
                 data = Table.read(os.path.expanduser(datafile),
-                                  format='ascii.csv')
+                                  format='ascii.csv', guess=False, fast_reader=True)
             return data
 
         else:
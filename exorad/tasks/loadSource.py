@@ -62,7 +62,7 @@ class LoadSource(Task):
             star = Star('.',
                         target.star.D,
                         target.star.Teff,
-                        target.star.calc_logg(target.star.M, target.star.R),
+                        target.calc_logg(target.star.M, target.star.R),
                         0.0,
                         target.star.R,
                         use_planck_spectrum=True)
@@ -71,7 +71,7 @@ class LoadSource(Task):
             star = Star(source['StellarModels']['value'],
                         target.star.D,
                         target.star.Teff,
-                        target.star.calc_logg(target.star.M, target.star.R),
+                        target.calc_logg(target.star.M, target.star.R),
                         0.0,
                         target.star.R,
                         use_planck_spectrum=False)
@@ -85,7 +85,7 @@ class LoadSource(Task):
             star = Star('.',
                         target.star.D,
                         target.star.Teff,
-                        target.star.calc_logg(target.star.M, target.star.R),
+                        target.calc_logg(target.star.M, target.star.R),
                         0.0,
                         target.star.R,
                         use_planck_spectrum=True)
@@ -4,6 +4,8 @@ import astropy.units as u
 import numpy as np
 from astropy.table import Table, QTable, vstack
 
+from exorad.log.logger import Logger
+
 def progressbar(it, prefix="", size=60, file=sys.stdout, label=''):
     count = len(it)
     if count > 0:
@@ -55,9 +57,9 @@ def to_dict(obj, classkey=None):
             data[k] = {'value': obj[k]}
         return data
 
-    elif hasattr(obj, "__dict__"):
+    elif hasattr(obj, "__dict__") or isinstance(obj, Logger):
         data = dict([(key, to_dict(value, classkey))
-                     for key, value in obj.__dict__.items()
+                     for key, value in _attributes(obj).items()
                      if not callable(value) and not key.startswith('_') and key not in ['name']])
         if classkey is not None and hasattr(obj, "__class__"):
             data[classkey] = obj.__class__.__name__
@@ -66,22 +68,40 @@ def to_dict(obj, classkey=None):
         return obj
 
 
+def _attributes(obj):
+    # instance attributes, stored either in __slots__ or in __dict__
+    attributes = {}
+    for cls in reversed(type(obj).__mro__):
+        slots = cls.__dict__.get('__slots__', ())
+        for slot in ((slots,) if isinstance(slots, str) else slots):
+            if hasattr(obj, slot):
+                attributes[slot] = getattr(obj, slot)
+    attributes.update(getattr(obj, '__dict__', {}))
+    return attributes
+
+
 def vstack_tables(table_list):
-    table = False
+    """
+    Stacks a list of tables with a single vstack call, so the cost is linear in the total number of rows.
+    Columns missing from a table are filled with zeros, with the unit of the first table containing them.
+    The input tables are not modified.
+    """
+    table_list = [tab.copy(copy_data=False) for tab in table_list]
+    if not table_list:
+        return False
+
+    # the first non empty table containing each column, read only if the column has to be padded
+    ref_tables = {}
+    for tab in table_list:
+        for col in tab.keys():
+            if col not in ref_tables or (len(tab) and not len(ref_tables[col])):
+                ref_tables[col] = tab
     for tab in table_list:
-        if not table:
-            table = tab
-        else:
-            col_name1 = [col for col in table.keys() if col not in tab.keys()]
-            if col_name1:
-                for c in col_name1:
-                    tab[c] = np.zeros(len(tab)) * table[c][0]
-            col_name2 = [col for col in tab.keys() if col not in table.keys()]
-            if col_name2:
-                for c in col_name2:
-                    table[c] = np.zeros(len(table)) * tab[c][0]
-            table = vstack([table, tab], join_type='outer')
-    return table
+        for col, ref_tab in ref_tables.items():
+            if col not in tab.keys():
+                ref = ref_tab[col][0] if len(ref_tab) else getattr(ref_tab[col], 'unit', 1)
+                tab[col] = np.zeros(len(tab)) * ref
+    return vstack(table_list, join_type='outer')
 
 
 def parse_range(inp, avail_values):
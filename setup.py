@@ -15,11 +15,12 @@ install_requires = ['astropy',
                     'seaborn',
                     'mpmath',
                     'numpy',
+                    'pandas',
                     'pyyaml',
                     'scipy',
                     'h5py',
                     'hdfdict',
-                    'xlrd',
+                    'python-calamine',
                     # 'xlwt'
                     ]
 entry_points = {'console_scripts': console_scripts, }
@@ -4,12 +4,14 @@ import pathlib
 import unittest
 
 import h5py
+import numpy as np
 
+from exorad.cache import GlobalCache
 from exorad.log import setLogLevel
 from exorad.models.instruments import Photometer, Spectrometer
 from exorad.output.hdf5 import HDF5Output
 from exorad.tasks import MergeChannelsOutput
-from exorad.tasks.instrumentHandler import BuildChannels, LoadPayload
+from exorad.tasks.instrumentHandler import BuildChannels, LoadPayload, PreparePayload
 from exorad.tasks.loadOptions import LoadOptions
 
 path = pathlib.Path(__file__).parent.absolute()
@@ -49,6 +51,17 @@ class InstrumentBuilderTest(unittest.TestCase):
     def test_builder_dict(self):
         self.assertListEqual(list(self.channels.keys()), ['Phot', 'Spec'])
 
+    def test_parallel_builder(self):
+        GlobalCache()['n_channel_thread'] = 2
+        try:
+            channels = self.buildChannels(payload=options, write=False, output=None)
+        finally:
+            GlobalCache()['n_channel_thread'] = 1
+        self.assertListEqual(list(channels.keys()), list(self.channels.keys()))
+        for ch in channels:
+            for col in channels[ch].table.keys():
+                self.assertTrue(np.all(channels[ch].table[col] == self.channels[ch].table[col]))
+
 
 class IOTest(unittest.TestCase):
     setLogLevel(logging.INFO)
@@ -74,6 +87,21 @@ class IOTest(unittest.TestCase):
         os.remove(self.fname)
 
 
+class PreparePayloadTest(unittest.TestCase):
+    setLogLevel(logging.INFO)
+
+    def test_prepare_from_h5(self):
+        preparePayload = PreparePayload()
+        fname = 'test_payload.h5'
+        payload, channels, wl_range = preparePayload(payload_file=os.path.join(data_dir, 'payload_example.xml'),
+                                                     output=fname)
+        payload_loaded, channels_loaded, wl_range_loaded = preparePayload(payload_file=fname, output=None)
+        os.remove(fname)
+
+        self.assertListEqual(list(channels.keys()), list(channels_loaded.keys()))
+        self.assertEqual(wl_range, wl_range_loaded)
+
+
 class MergeOutputTest(unittest.TestCase):
     setLogLevel(logging.INFO)
     buildChannels = BuildChannels()
@@ -83,3 +111,10 @@ class MergeOutputTest(unittest.TestCase):
 
     def test_table_output(self):
         table = self.mergeChannelsOutput(channels=self.channels)
+
+    def test_empty_table(self):
+        from exorad.utils.util import vstack_tables
+        tables = [ch.table for ch in self.channels.values()]
+        table = vstack_tables([tables[0][:0]] + tables[1:])
+        self.assertEqual(len(table), sum(len(tab) for tab in tables[1:]))
+        self.assertEqual(len(vstack_tables([tab[:0] for tab in tables])), 0)
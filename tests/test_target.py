@@ -4,14 +4,17 @@ import pathlib
 import unittest
 
 import astropy.units as u
+import numpy as np
 
 from exorad.log import setLogLevel
+from exorad.models.target import calc_logg, XLXSTargetList, OldExcelTargetList
 from exorad.output.hdf5 import HDF5Output
 from exorad.tasks import LoadSource
 from exorad.tasks.targetHandler import LoadTargetList, PrepareTarget
 
 path = pathlib.Path(__file__).parent.absolute()
 data_dir = os.path.join(path.parent.absolute(), 'examples')
+test_dir = os.path.join(path, 'test_data')
 
 setLogLevel(logging.DEBUG)
 
@@ -23,6 +26,61 @@ class TargetTest(unittest.TestCase):
         loadTargetList = LoadTargetList()
         targets = loadTargetList(target_list=self.target_list)
 
+    def test_target_list_units(self):
+        loadTargetList = LoadTargetList()
+        targets = loadTargetList(target_list=self.target_list)
+        star = targets.target[1].star
+        self.assertEqual(star.name, 'myTest2')
+        self.assertEqual(star.M, 1.5 * u.M_sun)
+        self.assertEqual(star.Teff, 6000 * u.K)
+        self.assertEqual(star.D, 10 * u.pc)
+
+    def test_target_list_cells(self):
+        targets = LoadTargetList()(target_list=os.path.join(test_dir, 'test_target_spaces.csv'))
+        self.assertListEqual([t.name for t in targets.target], ['myTest', 'NA', 'null'])
+        self.assertEqual(targets.target[0].star.M, 1 * u.M_sun)
+        self.assertEqual(targets.target[1].star.Teff, 4000 * u.K)
+        self.assertIs(targets.target[2].star.Teff, np.ma.masked)
+        self.assertListEqual([t.name for t in targets.searchTarget('na')], ['NA'])
+
+    def test_search_target(self):
+        loadTargetList = LoadTargetList()
+        targets = loadTargetList(target_list=self.target_list)
+        self.assertEqual([t.name for t in targets.searchTarget('my test')], ['myTest', 'myTest2'])
+        self.assertEqual([t.name for t in targets.searchTarget('MyTest2')], ['myTest2'])
+        self.assertEqual(targets.searchTarget('HD 209458'), [])
+        self.assertEqual([t.name for t in targets.searchTarget('test-2')], ['myTest2'])
+        self.assertEqual(len(targets.searchTarget('')), 2)
+
+    def test_target_table(self):
+        loadTargetList = LoadTargetList()
+        targets = loadTargetList(target_list=self.target_list)
+        self.assertEqual(len(targets), 2)
+        self.assertIs(targets[1], targets.target[1])
+        self.assertListEqual(list(targets.table['star_name']), ['myTest', 'myTest2'])
+        self.assertListEqual(list(targets.table['star_Teff'] > 5500 * u.K), [False, True])
+
+    def test_target_indexing(self):
+        loadTargetList = LoadTargetList()
+        targets = loadTargetList(target_list=self.target_list)
+        self.assertIs(targets[-1], targets[1])
+        self.assertEqual(targets[-1].id, 1)
+        self.assertEqual([t.id for t in targets.target], [0, 1])
+        self.assertEqual([t.name for t in targets[0:2]], ['myTest', 'myTest2'])
+        self.assertEqual([t.id for t in targets[::-1]], [1, 0])
+        self.assertEqual(targets[5:], [])
+        with self.assertRaises(IndexError):
+            targets[2]
+
+    def test_calc_logg(self):
+        loadTargetList = LoadTargetList()
+        targets = loadTargetList(target_list=self.target_list)
+        target = targets.target[0]
+        self.assertAlmostEqual(target.calc_logg(target.star.M, target.star.R), 4.438, places=3)
+        logg = calc_logg(targets.table['star_M'], targets.table['star_R'])
+        self.assertAlmostEqual(logg[0], 4.438, places=3)
+        self.assertAlmostEqual(logg[1], 4.614, places=3)
+
     def test_write(self):
         loadTargetList = LoadTargetList()
         targets = loadTargetList(target_list=self.target_list)
@@ -34,6 +92,36 @@ class TargetTest(unittest.TestCase):
         os.remove(fname)
 
 
+class ExcelTargetTest(unittest.TestCase):
+    target_list = os.path.join(test_dir, 'test_target.xlsx')
+
+    def test_xlsx_target_list(self):
+        targets = XLXSTargetList(self.target_list)
+        self.assertListEqual(list(targets.star_keys()), ['name', 'M', 'Teff', 'R', 'D', 'magK'])
+        self.assertListEqual(list(targets.planet_keys()),
+                             ['name', 'Mp', 'Rp', 'P', 'a', 'Tp', 'e', 'i', 'T14', 'albedo', 'k', 'Nobs'])
+        self.assertEqual(len(targets), 3)
+        target = targets.target[1]
+        self.assertEqual(target.name, 'Planet-1 b')
+        self.assertEqual(target.star.name, 'Star 1')
+        self.assertEqual(target.star.M, 2 * u.M_sun)
+        self.assertEqual(target.star.Teff, 5100 * u.K)
+        self.assertEqual(target.star.magK, 7)
+        self.assertEqual(target.planet.P, 3 * u.d)
+        self.assertEqual(target.planet.i, 88 * u.deg)
+        self.assertEqual(target.planet.Nobs, 3)
+        self.assertListEqual([t.planet.Nobs for t in targets.target], [2, 3, 4])
+
+    def test_old_excel_target_list(self):
+        targets = OldExcelTargetList(self.target_list)
+        self.assertEqual(len(targets.target), 3)
+        star = targets.target[2].star
+        self.assertEqual(star.name, 'Star 2')
+        self.assertEqual(star.D, 12 * u.pc)
+        self.assertEqual(star.R, 1 * u.R_sun)
+        self.assertEqual([t.star.name for t in targets.searchTarget('star1')], ['Star 1'])
+
+
 class SourceTest(unittest.TestCase):
     loadTargetList = LoadTargetList()
     target_list = os.path.join(data_dir, 'test_target.csv')